@@ -7,16 +7,19 @@ Supports searching papers, getting metadata, and extracting paper content.
 """
 
 import asyncio
-import json
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional
-import xml.etree.ElementTree as ET
-from urllib.parse import quote_plus
-import io
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus, urlencode
 import re
+import tempfile
+import threading
+from xml.parsers import expat
 
 import aiohttp
-import PyPDF2
+import orjson
+import pypdfium2 as pdfium
+from cachetools import LRUCache
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
@@ -33,12 +36,157 @@ from mcp.types import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("arxiv-mcp-server")
 
+# Whitespace cleanup patterns for extracted PDF text, compiled once
+_WS_RE = re.compile(r'[ \t\r\f\v]+')  # Runs of horizontal whitespace
+_NL_RE = re.compile(r'\s*\n\s*')  # Runs of newlines, including blank lines
+
+# Fewest pages extracted per PDF download (get_paper_content's default), so
+# short requests such as summarize_paper leave an entry longer ones can reuse
+_MIN_CACHED_PAGES = 20
+
+# PDFium is not thread-safe; extraction threads take turns calling into it
+_PDFIUM_LOCK = threading.Lock()
+
+# arXiv Atom tags as reported by expat with a ' ' namespace separator
+_ATOM = 'http://www.w3.org/2005/Atom'
+_TAG_ENTRY = f'{_ATOM} entry'
+_TAG_ID = f'{_ATOM} id'
+_TAG_TITLE = f'{_ATOM} title'
+_TAG_SUMMARY = f'{_ATOM} summary'
+_TAG_PUBLISHED = f'{_ATOM} published'
+_TAG_UPDATED = f'{_ATOM} updated'
+_TAG_NAME = f'{_ATOM} name'
+_TAG_CATEGORY = f'{_ATOM} category'
+_TAG_LINK = f'{_ATOM} link'
+# Entry elements whose character data is collected
+_TEXT_TAGS = frozenset({_TAG_ID, _TAG_TITLE, _TAG_SUMMARY, _TAG_PUBLISHED, _TAG_UPDATED, _TAG_NAME})
+
+# arXiv subject categories served by the arxiv://categories resource
+_ARXIV_CATEGORIES: Dict[str, List[str]] = {
+    "Computer Science": [
+        "cs.AI - Artificial Intelligence",
+        "cs.CL - Computation and Language",
+        "cs.CV - Computer Vision and Pattern Recognition",
+        "cs.LG - Machine Learning",
+        "cs.NE - Neural and Evolutionary Computing",
+        "cs.RO - Robotics"
+    ],
+    "Mathematics": [
+        "math.AG - Algebraic Geometry",
+        "math.GT - Geometric Topology",
+        "math.LO - Logic",
+        "math.NT - Number Theory",
+        "math.ST - Statistics Theory"
+    ],
+    "Physics": [
+        "physics.comp-ph - Computational Physics",
+        "physics.data-an - Data Analysis, Statistics and Probability",
+        "quant-ph - Quantum Physics"
+    ],
+    "Statistics": [
+        "stat.AP - Applications",
+        "stat.CO - Computation",
+        "stat.ML - Machine Learning",
+        "stat.TH - Theory"
+    ]
+}
+_ARXIV_CATEGORIES_JSON = orjson.dumps(_ARXIV_CATEGORIES).decode()
+
+# Body of the arxiv://search resource
+_SEARCH_RESOURCE_JSON = orjson.dumps({
+    "description": "Use the search_papers tool to find papers",
+    "example": "search_papers with query='machine learning'"
+}).decode()
+
+class _ArxivXmlParser:
+    """Single-use expat parser specialized for the arXiv Atom feed.
+    
+    Builds paper dicts straight from element callbacks without materializing
+    a tree. Only elements inside an entry are looked at.
+    """
+    
+    def __init__(self):
+        self.papers: List[Dict[str, Any]] = []
+        self._paper: Optional[Dict[str, Any]] = None
+        self._text: List[str] = []
+        self._capture = False
+        
+        self._parser = expat.ParserCreate(namespace_separator=' ')
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._parser.CharacterDataHandler = self._char_data
+    
+    def parse(self, xml_content: str) -> List[Dict[str, Any]]:
+        """Parse a complete feed and return the papers found"""
+        self._parser.Parse(xml_content, True)
+        return self.papers
+    
+    def _start_element(self, name: str, attrs: Dict[str, str]):
+        paper = self._paper
+        if paper is None:
+            if name == _TAG_ENTRY:
+                self._paper = {'id': '', 'title': '', 'summary': '', 'published': '', 'updated': '',
+                               'authors': [], 'categories': []}
+            return
+        
+        if name in _TEXT_TAGS:
+            self._text = []
+            self._capture = True
+        elif name == _TAG_CATEGORY:
+            term = attrs.get('term')
+            if term:
+                paper['categories'].append(term)
+        elif name == _TAG_LINK:
+            if attrs.get('title') == 'pdf':
+                paper['pdf_url'] = attrs.get('href')
+            elif attrs.get('rel') == 'alternate':
+                paper['link'] = attrs.get('href')
+    
+    def _char_data(self, data: str):
+        if self._capture:
+            self._text.append(data)
+    
+    def _end_element(self, name: str):
+        paper = self._paper
+        if paper is None:
+            return
+        
+        if name == _TAG_ENTRY:
+            self.papers.append(paper)
+            self._paper = None
+        elif self._capture:
+            self._capture = False
+            text = ''.join(self._text)
+            if name == _TAG_NAME:
+                paper['authors'].append(text)
+            elif name == _TAG_ID:
+                paper['id'] = text.split('/')[-1]
+            elif name == _TAG_TITLE:
+                paper['title'] = text.strip()
+            elif name == _TAG_SUMMARY:
+                paper['summary'] = text.strip()
+            elif name == _TAG_PUBLISHED:
+                paper['published'] = text
+            elif name == _TAG_UPDATED:
+                paper['updated'] = text
+
 class ArxivMCPServer:
     def __init__(self):
         self.app = Server("arxiv-mcp-server")
         self.session: Optional[aiohttp.ClientSession] = None
         self.base_url = "http://export.arxiv.org/api/query"
-        self.pdf_cache = {}  # Simple in-memory cache for PDF content
+        # Bounded in-memory caches keyed on the version-less arXiv ID.
+        # pdf_cache holds (page texts, whether every page was extracted).
+        self.pdf_cache: LRUCache = LRUCache(maxsize=128)
+        self.details_cache: LRUCache = LRUCache(maxsize=256)
+        # Parsed API responses keyed on a digest of the XML payload
+        self.parse_cache: LRUCache = LRUCache(maxsize=256)
+        # Validators and parsed papers per API query, for conditional GETs
+        self.query_cache: LRUCache = LRUCache(maxsize=128)
+        self.pdf_semaphore = asyncio.Semaphore(4)
+        # Pending PDF downloads, so concurrent requests for a paper share one fetch
+        self.pdf_inflight: Dict[str, asyncio.Future] = {}
         
         # Register handlers
         self._setup_handlers()
@@ -68,12 +216,9 @@ class ArxivMCPServer:
         async def handle_read_resource(uri: str) -> str:
             """Read a specific resource"""
             if uri == "arxiv://search":
-                return json.dumps({
-                    "description": "Use the search_papers tool to find papers",
-                    "example": "search_papers with query='machine learning'"
-                })
+                return _SEARCH_RESOURCE_JSON
             elif uri == "arxiv://categories":
-                return json.dumps(self._get_arxiv_categories())
+                return _ARXIV_CATEGORIES_JSON
             else:
                 raise ValueError(f"Unknown resource: {uri}")
         
@@ -181,10 +326,23 @@ class ArxivMCPServer:
                 logger.error(f"Error in tool {name}: {str(e)}")
                 return [TextContent(type="text", text=f"Error: {str(e)}")]
     
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create the long-lived aiohttp session shared by all tool calls"""
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=8,
+            ttl_dns_cache=300,
+            keepalive_timeout=75
+        )
+        timeout = aiohttp.ClientTimeout(total=60, sock_connect=10)
+        # aiohttp sets Accept-Encoding itself, adding br when it can decode Brotli
+        headers = {"User-Agent": "arxiv-mcp-server/1.0.0"}
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+    
     async def _ensure_session(self):
         """Ensure we have an active aiohttp session"""
         if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
+            raise RuntimeError("HTTP session is not open; start the server with run()")
     
     async def _search_papers(self, query: str, author: str = None, category: str = None, 
                            max_results: int = 10, sort_by: str = "relevance") -> List[TextContent]:
@@ -214,232 +372,302 @@ class ArxivMCPServer:
             "sortOrder": "descending"
         }
         
-        async with self.session.get(self.base_url, params=params) as response:
-            if response.status != 200:
-                raise Exception(f"arXiv API error: {response.status}")
-            
-            content = await response.text()
-            papers = self._parse_arxiv_response(content)
-            
-            if not papers:
-                return [TextContent(type="text", text="No papers found matching your query.")]
-            
-            # Format results
-            result = f"Found {len(papers)} papers:\n\n"
-            for i, paper in enumerate(papers, 1):
-                result += f"{i}. **{paper['title']}**\n"
-                result += f"   Authors: {', '.join(paper['authors'])}\n"
-                result += f"   arXiv ID: {paper['id']}\n"
-                result += f"   Published: {paper['published']}\n"
-                result += f"   Categories: {', '.join(paper['categories'])}\n"
-                result += f"   Abstract: {paper['summary'][:200]}...\n"
-                result += f"   URL: {paper['link']}\n\n"
-            
-            return [TextContent(type="text", text=result)]
+        papers = await self._query_arxiv(params)
+        
+        if not papers:
+            return [TextContent(type="text", text="No papers found matching your query.")]
+        
+        # Format results
+        parts = [f"Found {len(papers)} papers:\n"]
+        for i, paper in enumerate(papers, 1):
+            parts.append(
+                f"{i}. **{paper['title']}**\n"
+                f"   Authors: {', '.join(paper['authors'])}\n"
+                f"   arXiv ID: {paper['id']}\n"
+                f"   Published: {paper['published']}\n"
+                f"   Categories: {', '.join(paper['categories'])}\n"
+                f"   Abstract: {paper['summary'][:200]}...\n"
+                f"   URL: {paper['link']}\n"
+            )
+        
+        return [TextContent(type="text", text="\n".join(parts))]
     
     async def _get_paper_details(self, arxiv_id: str) -> List[TextContent]:
         """Get detailed information about a specific paper"""
+        paper = await self._get_paper_metadata(arxiv_id)
+        
+        if paper is None:
+            return [TextContent(type="text", text=f"Paper with ID {arxiv_id} not found.")]
+        
+        return [TextContent(type="text", text=self._format_paper_details(paper))]
+    
+    async def _get_paper_metadata(self, arxiv_id: str) -> Optional[Dict[str, Any]]:
+        """Return the parsed metadata of a paper, or None if arXiv has no such paper"""
         await self._ensure_session()
         
         # Clean arxiv_id (remove version if present)
         clean_id = arxiv_id.split('v')[0]
         
-        params = {
-            "id_list": clean_id,
-            "max_results": 1
-        }
+        paper = self.details_cache.get(clean_id)
+        if paper is None:
+            params = {
+                "id_list": clean_id,
+                "max_results": 1
+            }
+            
+            papers = await self._query_arxiv(params)
+            
+            if not papers:
+                return None
+            
+            paper = papers[0]
+            self.details_cache[clean_id] = paper
         
-        async with self.session.get(self.base_url, params=params) as response:
+        return paper
+    
+    def _format_paper_details(self, paper: Dict[str, Any]) -> str:
+        """Format detailed information about a paper"""
+        return (
+            f"**{paper['title']}**\n\n"
+            f"**arXiv ID:** {paper['id']}\n"
+            f"**Authors:** {', '.join(paper['authors'])}\n"
+            f"**Published:** {paper['published']}\n"
+            f"**Updated:** {paper['updated']}\n"
+            f"**Categories:** {', '.join(paper['categories'])}\n"
+            f"**URL:** {paper['link']}\n"
+            f"**PDF:** {paper['pdf_url']}\n\n"
+            f"**Abstract:**\n{paper['summary']}\n"
+        )
+    
+    async def _query_arxiv(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run an arXiv API query, revalidating earlier results with a conditional GET"""
+        cache_key = urlencode(sorted(params.items()))
+        cached = self.query_cache.get(cache_key)
+        
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        async with self.session.get(self.base_url, params=params, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                return list(cached[2])
+            
             if response.status != 200:
                 raise Exception(f"arXiv API error: {response.status}")
             
             content = await response.text()
             papers = self._parse_arxiv_response(content)
             
-            if not papers:
-                return [TextContent(type="text", text=f"Paper with ID {arxiv_id} not found.")]
-            
-            paper = papers[0]
-            
-            # Format detailed information
-            result = f"**{paper['title']}**\n\n"
-            result += f"**arXiv ID:** {paper['id']}\n"
-            result += f"**Authors:** {', '.join(paper['authors'])}\n"
-            result += f"**Published:** {paper['published']}\n"
-            result += f"**Updated:** {paper['updated']}\n"
-            result += f"**Categories:** {', '.join(paper['categories'])}\n"
-            result += f"**URL:** {paper['link']}\n"
-            result += f"**PDF:** {paper['pdf_url']}\n\n"
-            result += f"**Abstract:**\n{paper['summary']}\n"
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.query_cache[cache_key] = (etag, last_modified, tuple(papers))
             
-            return [TextContent(type="text", text=result)]
+            return papers
     
     async def _get_paper_content(self, arxiv_id: str, max_pages: int = 20) -> List[TextContent]:
         """Extract text content from paper PDF"""
+        try:
+            pages = await self._get_paper_pages(arxiv_id, max_pages)
+            return [TextContent(type="text", text=self._format_pdf_pages(pages))]
+            
+        except Exception as e:
+            logger.error(f"Error extracting PDF content: {str(e)}")
+            return [TextContent(type="text", text=f"Error extracting PDF content: {str(e)}")]
+    
+    async def _get_paper_pages(self, arxiv_id: str, max_pages: int) -> List[str]:
+        """Return the text of up to max_pages pages of a paper's PDF"""
         await self._ensure_session()
         
-        # Check cache first
-        cache_key = f"{arxiv_id}_{max_pages}"
-        if cache_key in self.pdf_cache:
-            return [TextContent(type="text", text=self.pdf_cache[cache_key])]
-        
         # Clean arxiv_id
         clean_id = arxiv_id.split('v')[0]
-        pdf_url = f"https://arxiv.org/pdf/{clean_id}.pdf"
+        
+        while True:
+            # Check cache first; an entry serves any request it has enough pages for
+            cached = self.pdf_cache.get(clean_id)
+            if cached is not None:
+                pages, complete = cached
+                if complete or len(pages) >= max_pages:
+                    return pages[:max_pages]
+            
+            # Join an in-flight download of the same paper instead of starting another
+            inflight = self.pdf_inflight.get(clean_id)
+            if inflight is None:
+                break
+            
+            try:
+                pages, complete = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The owning request was cancelled; look again
+                continue
+            
+            if complete or len(pages) >= max_pages:
+                return pages[:max_pages]
+            # Too few pages; the first waiter to get here starts a larger
+            # download and the rest join it on the next pass
+        
+        future = asyncio.get_running_loop().create_future()
+        self.pdf_inflight[clean_id] = future
         
         try:
-            async with self.session.get(pdf_url) as response:
+            pages, complete = await self._download_pdf_pages(clean_id, max(max_pages, _MIN_CACHED_PAGES))
+            future.set_result((pages, complete))
+            
+            # Cache the page texts rather than the raw PDF or formatted output,
+            # keeping whichever entry covers more of the document
+            cached = self.pdf_cache.get(clean_id)
+            if cached is None or complete or len(pages) > len(cached[0]):
+                self.pdf_cache[clean_id] = (pages, complete)
+            
+            return pages[:max_pages]
+        except Exception as e:
+            # Waiters fail with the same error rather than all retrying at once
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody is waiting
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            if self.pdf_inflight.get(clean_id) is future:
+                del self.pdf_inflight[clean_id]
+    
+    async def _download_pdf_pages(self, clean_id: str, max_pages: int) -> Tuple[List[str], bool]:
+        """Download a paper PDF and extract up to max_pages pages of text"""
+        pdf_url = f"https://arxiv.org/pdf/{clean_id}.pdf"
+        
+        # Limit how many PDFs are downloaded and parsed at once
+        async with self.pdf_semaphore:
+            # Large PDFs may take longer than the session's total timeout; only
+            # bound connecting and stalls between reads
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=30)
+            async with self.session.get(pdf_url, timeout=timeout) as response:
                 if response.status != 200:
                     raise Exception(f"Failed to download PDF: {response.status}")
                 
-                pdf_data = await response.read()
-                
-                # Extract text from PDF
-                text_content = self._extract_pdf_text(pdf_data, max_pages)
-                
-                # Cache the result
-                self.pdf_cache[cache_key] = text_content
-                
-                return [TextContent(type="text", text=text_content)]
-                
-        except Exception as e:
-            logger.error(f"Error extracting PDF content: {str(e)}")
-            return [TextContent(type="text", text=f"Error extracting PDF content: {str(e)}")]
+                # Stream the PDF into a spooled file; large PDFs spill to disk
+                with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as pdf_file:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        pdf_file.write(chunk)
+                    pdf_file.seek(0)
+                    
+                    # Extract text from PDF off the event loop; parsing is CPU-bound
+                    extraction = asyncio.ensure_future(
+                        asyncio.to_thread(self._extract_pdf_pages, pdf_file, max_pages)
+                    )
+                    try:
+                        return await asyncio.shield(extraction)
+                    except asyncio.CancelledError:
+                        # The worker thread keeps reading pdf_file; hold the file,
+                        # the semaphore slot and the in-flight entry until it is done
+                        while not extraction.done():
+                            try:
+                                await asyncio.wait([extraction])
+                            except asyncio.CancelledError:
+                                pass
+                        if not extraction.cancelled():
+                            extraction.exception()  # Mark retrieved; the caller is gone
+                        raise
     
     async def _summarize_paper(self, arxiv_id: str) -> List[TextContent]:
         """Get a summary of the paper"""
-        # Get paper details first
-        details = await self._get_paper_details(arxiv_id)
+        # Fetch metadata and the first pages concurrently; both are served
+        # from the shared caches when warm
+        paper, pages = await asyncio.gather(
+            self._get_paper_metadata(arxiv_id),
+            self._get_paper_pages(arxiv_id, max_pages=3),
+            return_exceptions=True
+        )
         
-        if not details or "not found" in details[0].text.lower():
-            return details
+        if isinstance(paper, BaseException):
+            raise paper
         
-        # Try to get a bit of the content for additional context
-        try:
-            content = await self._get_paper_content(arxiv_id, max_pages=3)
-            if content and len(content[0].text) > 1000:
+        if paper is None:
+            return [TextContent(type="text", text=f"Paper with ID {arxiv_id} not found.")]
+        
+        summary = self._format_paper_details(paper)
+        
+        # Use the content for additional context when it was fetched successfully
+        if isinstance(pages, BaseException):
+            logger.error(f"Error extracting PDF content: {str(pages)}")
+        else:
+            text = self._format_pdf_pages(pages)
+            if len(text) > 1000:
                 # Extract first few paragraphs
-                text = content[0].text
                 paragraphs = text.split('\n\n')[:5]  # First 5 paragraphs
                 intro_text = '\n\n'.join(paragraphs)
                 
-                summary = details[0].text + f"\n\n**Introduction/Content Preview:**\n{intro_text[:1500]}..."
-                return [TextContent(type="text", text=summary)]
-        except:
-            pass
+                summary += f"\n\n**Introduction/Content Preview:**\n{intro_text[:1500]}..."
         
-        return details
+        return [TextContent(type="text", text=summary)]
     
     def _parse_arxiv_response(self, xml_content: str) -> List[Dict[str, Any]]:
-        """Parse arXiv API XML response"""
-        papers = []
+        """Parse arXiv API XML response, reusing earlier results for identical payloads"""
+        key = hashlib.blake2b(xml_content.encode('utf-8'), digest_size=16).digest()
+        papers = self.parse_cache.get(key)
+        if papers is None:
+            papers = tuple(self._parse_arxiv_xml(xml_content))
+            self.parse_cache[key] = papers
+        return list(papers)
+    
+    def _parse_arxiv_xml(self, xml_content: str) -> List[Dict[str, Any]]:
+        """Parse arXiv API XML into paper dicts"""
+        parser = _ArxivXmlParser()
         
         try:
-            root = ET.fromstring(xml_content)
-            
-            # Define namespace
-            ns = {'atom': 'http://www.w3.org/2005/Atom',
-                  'arxiv': 'http://arxiv.org/schemas/atom'}
-            
-            for entry in root.findall('atom:entry', ns):
-                paper = {}
-                
-                # Basic information
-                paper['id'] = entry.find('atom:id', ns).text.split('/')[-1]
-                paper['title'] = entry.find('atom:title', ns).text.strip()
-                paper['summary'] = entry.find('atom:summary', ns).text.strip()
-                paper['published'] = entry.find('atom:published', ns).text
-                paper['updated'] = entry.find('atom:updated', ns).text
-                
-                # Authors
-                authors = []
-                for author in entry.findall('atom:author', ns):
-                    name = author.find('atom:name', ns)
-                    if name is not None:
-                        authors.append(name.text)
-                paper['authors'] = authors
-                
-                # Categories
-                categories = []
-                for category in entry.findall('atom:category', ns):
-                    term = category.get('term')
-                    if term:
-                        categories.append(term)
-                paper['categories'] = categories
-                
-                # Links
-                for link in entry.findall('atom:link', ns):
-                    if link.get('title') == 'pdf':
-                        paper['pdf_url'] = link.get('href')
-                    elif link.get('rel') == 'alternate':
-                        paper['link'] = link.get('href')
-                
-                papers.append(paper)
-                
-        except ET.ParseError as e:
+            parser.parse(xml_content)
+        except expat.ExpatError as e:
             logger.error(f"Error parsing XML: {str(e)}")
             
-        return papers
+        return parser.papers
     
-    def _extract_pdf_text(self, pdf_data: bytes, max_pages: int) -> str:
-        """Extract text from PDF data"""
-        try:
-            pdf_file = io.BytesIO(pdf_data)
-            reader = PyPDF2.PdfReader(pdf_file)
-            
-            text_parts = []
-            num_pages = min(len(reader.pages), max_pages)
-            
-            for page_num in range(num_pages):
-                page = reader.pages[page_num]
-                text = page.extract_text()
-                
-                # Clean up the text
-                text = re.sub(r'\s+', ' ', text)  # Replace multiple whitespaces
-                text = re.sub(r'\n+', '\n', text)  # Replace multiple newlines
+    def _extract_pdf_pages(self, pdf_file: BinaryIO, max_pages: int) -> Tuple[List[str], bool]:
+        """Extract cleaned text of up to max_pages pages from a seekable PDF file.
+        
+        Returns the page texts and whether the whole document was extracted.
+        """
+        pages = []
+        
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_file)
+            try:
+                # Page count comes from the page tree; only requested pages are loaded
+                total_pages = len(pdf)
+                num_pages = min(total_pages, max_pages)
                 
-                text_parts.append(f"--- Page {page_num + 1} ---\n{text}\n")
-            
-            result = '\n'.join(text_parts)
-            
-            if len(result) < 100:
-                return "Warning: Extracted text is very short. PDF might be image-based or have extraction issues.\n\n" + result
-            
-            return result
-            
-        except Exception as e:
-            return f"Error extracting PDF text: {str(e)}"
+                for page_num in range(num_pages):
+                    page = pdf[page_num]
+                    textpage = page.get_textpage()
+                    try:
+                        text = textpage.get_text_range()
+                    finally:
+                        textpage.close()
+                        page.close()
+                    
+                    # Clean up the text
+                    text = _WS_RE.sub(' ', text)
+                    text = _NL_RE.sub('\n', text)
+                    
+                    pages.append(text)
+            finally:
+                pdf.close()
+        
+        return pages, num_pages == total_pages
     
-    def _get_arxiv_categories(self) -> Dict[str, List[str]]:
-        """Return arXiv subject categories"""
-        return {
-            "Computer Science": [
-                "cs.AI - Artificial Intelligence",
-                "cs.CL - Computation and Language",
-                "cs.CV - Computer Vision and Pattern Recognition",
-                "cs.LG - Machine Learning",
-                "cs.NE - Neural and Evolutionary Computing",
-                "cs.RO - Robotics"
-            ],
-            "Mathematics": [
-                "math.AG - Algebraic Geometry",
-                "math.GT - Geometric Topology",
-                "math.LO - Logic",
-                "math.NT - Number Theory",
-                "math.ST - Statistics Theory"
-            ],
-            "Physics": [
-                "physics.comp-ph - Computational Physics",
-                "physics.data-an - Data Analysis, Statistics and Probability",
-                "quant-ph - Quantum Physics"
-            ],
-            "Statistics": [
-                "stat.AP - Applications",
-                "stat.CO - Computation",
-                "stat.ML - Machine Learning",
-                "stat.TH - Theory"
-            ]
-        }
+    def _format_pdf_pages(self, pages: List[str]) -> str:
+        """Format extracted page texts for output"""
+        text_parts = [f"--- Page {page_num} ---\n{text}\n" for page_num, text in enumerate(pages, 1)]
+        result = '\n'.join(text_parts)
+        
+        if len(result) < 100:
+            return "Warning: Extracted text is very short. PDF might be image-based or have extraction issues.\n\n" + result
+        
+        return result
     
     async def run(self):
         """Run the MCP server"""
@@ -455,12 +683,14 @@ class ArxivMCPServer:
             }
         )
         
-        async with stdio_server() as (read_stream, write_stream):
-            await self.app.run(
-                read_stream,
-                write_stream,
-                init_options
-            )
+        self.session = self._create_session()
+        async with self.session:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.app.run(
+                    read_stream,
+                    write_stream,
+                    init_options
+                )
 
 async def main():
     """Main entry point"""